@@ -9,6 +9,14 @@ from discord import app_commands, Embed
 import json
 import os
 import aiohttp
+import asyncio
+import time
+import bisect
+import struct
+import zlib
+import gc
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 import traceback
 
 # Constants
@@ -18,25 +26,43 @@ MAX_LEADERBOARD_PLAYERS = 99  # Max players to display on leaderboard
 MAX_AVATAR_FETCH_SIZE = 200 # Max bytes to fetch at once
 AVATAR_DISPLAY_SIZE = 64    # Resize avatar
 DATA_FILE = "data.json"  # Data file
+SNAPSHOT_FILE = "data.snapshot"  # Binary copy of data with precomputed stats for fast startup
+SNAPSHOT_VERSION = 2  # Bump whenever the snapshot layout or stored user/artifact fields change
 LANG_FILE = "languages.json"  # Multilingual mapping
+LIVE_LEADERBOARD_FILE = "live_leaderboards.json"  # Channels with an auto-updating leaderboard
+LIVE_LEADERBOARD_EDIT_INTERVAL = 30  # Min seconds between live leaderboard edits
 EASYOCR_API_URL = "https://api.easyocr.org/ocr"
+LOW_MEMORY_MODE = False  # Look up guild members on demand instead of caching every member of every guild
+MEMBER_CACHE_SIZE = 1000  # Max members kept by the low-memory member cache
+MEMBER_CACHE_TTL = 10 * 60  # Seconds before a cached member is looked up again
+MEMBER_QUERY_LIMIT = 100  # Max members Discord returns per query
+LEADERBOARD_WINDOWS = {  # Time windows kept up to date incrementally (name -> seconds)
+    "24h": 24 * 60 * 60,
+    "7d": 7 * 24 * 60 * 60,
+    "30d": 30 * 24 * 60 * 60
+}
+WINDOW_UNITS = {"h": 60 * 60, "d": 24 * 60 * 60, "w": 7 * 24 * 60 * 60}  # Units for custom windows like "3d"
 
 # Setup intents
 intents = discord.Intents.default()
 intents.message_content = True  # optional for future features
 intents.members = True  # Required to fetch guild members
 
+# Low-memory mode skips member chunking at startup and discord.py's member cache.
+# The members intent stays on so members can still be queried on demand.
+bot_options = {}
+if LOW_MEMORY_MODE:
+    bot_options["chunk_guilds_at_startup"] = False
+    bot_options["member_cache_flags"] = discord.MemberCacheFlags.none()
+
 # Create bot
 # Can't use command_prefix=None because it must have a valid prefix
 bot = commands.Bot(
     command_prefix="THIS_PREFIX_WILL_NEVER_BE_TYPED_BY_A_HUMAN_1234567890",
-    intents=intents
+    intents=intents,
+    **bot_options
 )
 
-# Load token
-with open("token", "r") as f:
-    TOKEN = f.read().strip()
-
 # Data helper functions
 def load_data():
     if os.path.exists(DATA_FILE):
@@ -47,6 +73,161 @@ def load_data():
 def save_data(data):
     with open(DATA_FILE, "w") as f:
         json.dump(data, f, indent=4)
+    save_snapshot(data)
+
+# ----------------- Snapshot -----------------
+
+# Layout (little-endian):
+#   header: magic, version, payload length, payload CRC32, data.json size and mtime when written
+#   payload: user count, then per user:
+#     user_id, display_name, username, language (length-prefixed UTF-8, NO_STRING = None)
+#     max_cv, count_45, count_40, artifact count
+#     artifacts: crit_rate, crit_dmg, cv, submitted_at (UNKNOWN_TIME = None)
+#   time index: entry count, then all submitted_at values and then all (user position, artifact position),
+#     both in submission order
+SNAPSHOT_MAGIC = b"CVLB"
+SNAPSHOT_HEADER = struct.Struct("<4sHQIqq")
+SNAPSHOT_COUNT = struct.Struct("<I")
+SNAPSHOT_STATS = struct.Struct("<diiI")
+SNAPSHOT_ARTIFACT = struct.Struct("<dddq")
+SNAPSHOT_TIME_POSITION = struct.Struct("<II")
+NO_STRING = 0xFFFFFFFF
+UNKNOWN_TIME = -2 ** 63
+
+# Size and mtime of data.json, used to detect edits made without updating the snapshot
+def get_data_file_stamp():
+    try:
+        stat = os.stat(DATA_FILE)
+    except FileNotFoundError:
+        return -1, -1
+    return stat.st_size, stat.st_mtime_ns
+
+def pack_string(parts: list, value):
+    if value is None:
+        parts.append(SNAPSHOT_COUNT.pack(NO_STRING))
+        return
+    encoded = value.encode("utf-8")
+    parts.append(SNAPSHOT_COUNT.pack(len(encoded)))
+    parts.append(encoded)
+
+def unpack_string(payload, offset: int):
+    (length,) = SNAPSHOT_COUNT.unpack_from(payload, offset)
+    offset += SNAPSHOT_COUNT.size
+    if length == NO_STRING:
+        return None, offset
+    return bytes(payload[offset:offset + length]).decode("utf-8"), offset + length
+
+def save_snapshot(data):
+    parts = [SNAPSHOT_COUNT.pack(len(data))]
+    positions = {}  # id(artifact) -> (user position, artifact position)
+    for user_position, (user_id, user_data) in enumerate(data.items()):
+        pack_string(parts, user_id)
+        pack_string(parts, user_data.get("display_name"))
+        pack_string(parts, user_data.get("username"))
+        pack_string(parts, user_data.get("language"))
+        artifacts = user_data.get("artifacts", [])
+        parts.append(SNAPSHOT_STATS.pack(
+            user_data.get("max_cv", 0), user_data.get("count_45", 0), user_data.get("count_40", 0), len(artifacts)
+        ))
+        for artifact_position, arti in enumerate(artifacts):
+            submitted_at = arti.get("submitted_at")
+            parts.append(SNAPSHOT_ARTIFACT.pack(
+                arti["crit_rate"], arti["crit_dmg"], arti["cv"],
+                UNKNOWN_TIME if submitted_at is None else submitted_at
+            ))
+            positions[id(arti)] = (user_position, artifact_position)
+
+    # Store the time index as it is kept in memory, so loading never has to sort
+    time_entries = [
+        (submitted_at, positions[id(arti)])
+        for submitted_at, (_, arti) in zip(artifact_index_times, artifact_index_entries)
+        if id(arti) in positions
+    ]
+    parts.append(SNAPSHOT_COUNT.pack(len(time_entries)))
+    parts.append(struct.pack(f"<{len(time_entries)}q", *(submitted_at for submitted_at, _ in time_entries)))
+    parts.extend(SNAPSHOT_TIME_POSITION.pack(*position) for _, position in time_entries)
+    payload = b"".join(parts)
+
+    json_size, json_mtime = get_data_file_stamp()
+    header = SNAPSHOT_HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(payload), zlib.crc32(payload), json_size, json_mtime
+    )
+
+    # Write atomically so a crash never leaves a half-written snapshot
+    tmp_file = SNAPSHOT_FILE + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp_file, SNAPSHOT_FILE)
+
+# Load data and its time index from the snapshot as (data, index times, index entries).
+# Returns None if it is missing, corrupt, outdated or older than data.json.
+def load_snapshot():
+    if not os.path.exists(SNAPSHOT_FILE):
+        return None
+    with open(SNAPSHOT_FILE, "rb") as f:
+        raw = f.read()
+
+    if len(raw) < SNAPSHOT_HEADER.size:
+        return None
+    magic, version, length, checksum, json_size, json_mtime = SNAPSHOT_HEADER.unpack_from(raw)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        return None
+    if (json_size, json_mtime) != get_data_file_stamp():
+        return None
+    payload = memoryview(raw)[SNAPSHOT_HEADER.size:]
+    if len(payload) != length or zlib.crc32(payload) != checksum:
+        return None
+
+    try:
+        data = {}
+        user_artifacts = []  # (user_id, artifacts) by user position
+        (user_count,) = SNAPSHOT_COUNT.unpack_from(payload, 0)
+        offset = SNAPSHOT_COUNT.size
+        for _ in range(user_count):
+            user_id, offset = unpack_string(payload, offset)
+            display_name, offset = unpack_string(payload, offset)
+            username, offset = unpack_string(payload, offset)
+            language, offset = unpack_string(payload, offset)
+            max_cv, count_45, count_40, artifact_count = SNAPSHOT_STATS.unpack_from(payload, offset)
+            offset += SNAPSHOT_STATS.size
+
+            end = offset + artifact_count * SNAPSHOT_ARTIFACT.size
+            artifacts = [
+                {
+                    "crit_rate": crit_rate,
+                    "crit_dmg": crit_dmg,
+                    "cv": cv,
+                    "submitted_at": None if submitted_at == UNKNOWN_TIME else submitted_at
+                }
+                for crit_rate, crit_dmg, cv, submitted_at in SNAPSHOT_ARTIFACT.iter_unpack(payload[offset:end])
+            ]
+            offset = end
+
+            data[user_id] = {
+                "display_name": display_name,
+                "username": username,
+                "artifacts": artifacts,
+                "max_cv": max_cv,
+                "count_45": count_45,
+                "count_40": count_40
+            }
+            if language is not None:
+                data[user_id]["language"] = language
+            user_artifacts.append((user_id, artifacts))
+
+        (entry_count,) = SNAPSHOT_COUNT.unpack_from(payload, offset)
+        offset += SNAPSHOT_COUNT.size
+        index_times = list(struct.unpack_from(f"<{entry_count}q", payload, offset))
+        offset += entry_count * 8
+        end = offset + entry_count * SNAPSHOT_TIME_POSITION.size
+        index_entries = [
+            (user_artifacts[user_position][0], user_artifacts[user_position][1][artifact_position])
+            for user_position, artifact_position in SNAPSHOT_TIME_POSITION.iter_unpack(payload[offset:end])
+        ]
+    except (struct.error, UnicodeDecodeError, IndexError):
+        return None
+    return data, index_times, index_entries
 
 # Precompute stats on startup
 def initialize_leaderboard_stats():
@@ -61,8 +242,184 @@ def initialize_leaderboard_stats():
             user_data["count_45"] = 0
             user_data["count_40"] = 0
 
-data = load_data()
-initialize_leaderboard_stats()
+        # Artifacts submitted before timestamps were recorded have an unknown time
+        for arti in artifacts:
+            arti.setdefault("submitted_at", None)
+
+    build_time_index()
+
+# ----------------- Time Windows -----------------
+
+# Artifacts with a known submission time, ordered by that time
+artifact_index_times = []    # Sorted submission timestamps
+artifact_index_entries = []  # (user_id, artifact) matching artifact_index_times
+
+# Incremental aggregates for LEADERBOARD_WINDOWS
+window_cvs = {name: {} for name in LEADERBOARD_WINDOWS}  # window -> user_id -> sorted CVs
+window_cutoffs = {name: 0 for name in LEADERBOARD_WINDOWS}  # Artifacts older than this have been expired
+
+def now_timestamp():
+    return int(time.time())
+
+# Rebuild the time index and window aggregates from data
+def build_time_index():
+    artifact_index_entries[:] = [
+        (user_id, arti)
+        for user_id, user_data in data.items()
+        for arti in user_data.get("artifacts", [])
+        if arti.get("submitted_at") is not None
+    ]
+    artifact_index_entries.sort(key=lambda entry: entry[1]["submitted_at"])
+    artifact_index_times[:] = [arti["submitted_at"] for _, arti in artifact_index_entries]
+    build_window_aggregates()
+
+# Rebuild the window aggregates from the time index. Only artifacts inside a window are visited.
+def build_window_aggregates():
+    now = now_timestamp()
+    for name, duration in LEADERBOARD_WINDOWS.items():
+        window_cvs[name] = {}
+        window_cutoffs[name] = now - duration
+        start = bisect.bisect_left(artifact_index_times, window_cutoffs[name])
+        for user_id, arti in artifact_index_entries[start:]:
+            window_cvs[name].setdefault(user_id, []).append(arti["cv"])
+        for cvs in window_cvs[name].values():
+            cvs.sort()
+
+def add_window_cv(name: str, user_id: str, cv: float):
+    bisect.insort(window_cvs[name].setdefault(user_id, []), cv)
+
+def remove_window_cv(name: str, user_id: str, cv: float):
+    cvs = window_cvs[name].get(user_id)
+    if not cvs:
+        return
+    idx = bisect.bisect_left(cvs, cv)
+    if idx < len(cvs) and cvs[idx] == cv:
+        del cvs[idx]
+    if not cvs:
+        del window_cvs[name][user_id]
+
+# Drop artifacts that have aged out of each window
+def expire_leaderboard_windows(now: int = None):
+    now = now if now is not None else now_timestamp()
+    for name, duration in LEADERBOARD_WINDOWS.items():
+        new_cutoff = now - duration
+        if new_cutoff <= window_cutoffs[name]:
+            continue
+        start = bisect.bisect_left(artifact_index_times, window_cutoffs[name])
+        end = bisect.bisect_left(artifact_index_times, new_cutoff)
+        for user_id, arti in artifact_index_entries[start:end]:
+            remove_window_cv(name, user_id, arti["cv"])
+        window_cutoffs[name] = new_cutoff
+
+# Add a newly submitted artifact to the time index and windows
+def index_artifact(user_id: str, artifact: dict):
+    submitted_at = artifact.get("submitted_at")
+    if submitted_at is None:
+        return
+    expire_leaderboard_windows()
+    pos = bisect.bisect_right(artifact_index_times, submitted_at)
+    artifact_index_times.insert(pos, submitted_at)
+    artifact_index_entries.insert(pos, (user_id, artifact))
+    for name in LEADERBOARD_WINDOWS:
+        if submitted_at >= window_cutoffs[name]:
+            add_window_cv(name, user_id, artifact["cv"])
+
+# Remove an artifact from the time index and windows
+def unindex_artifact(user_id: str, artifact: dict):
+    submitted_at = artifact.get("submitted_at")
+    if submitted_at is None:
+        return
+    start = bisect.bisect_left(artifact_index_times, submitted_at)
+    end = bisect.bisect_right(artifact_index_times, submitted_at)
+    for pos in range(start, end):
+        if artifact_index_entries[pos][1] is artifact:
+            del artifact_index_times[pos]
+            del artifact_index_entries[pos]
+            break
+    for name in LEADERBOARD_WINDOWS:
+        if submitted_at >= window_cutoffs[name]:
+            remove_window_cv(name, user_id, artifact["cv"])
+
+# Update window aggregates after an artifact's CV was modified
+def reindex_artifact_cv(user_id: str, artifact: dict, old_cv: float):
+    submitted_at = artifact.get("submitted_at")
+    if submitted_at is None:
+        return
+    for name in LEADERBOARD_WINDOWS:
+        if submitted_at >= window_cutoffs[name]:
+            remove_window_cv(name, user_id, old_cv)
+            add_window_cv(name, user_id, artifact["cv"])
+
+# (max_cv, count_45, count_40) for each user in a configured window
+def get_configured_window_stats(name: str):
+    expire_leaderboard_windows()
+    return {
+        user_id: (
+            cvs[-1],
+            len(cvs) - bisect.bisect_left(cvs, 45),
+            len(cvs) - bisect.bisect_left(cvs, 40)
+        )
+        for user_id, cvs in window_cvs[name].items()
+    }
+
+# (max_cv, count_45, count_40) for each user with artifacts submitted in [start, end)
+def get_range_stats(start: int, end: int = None):
+    lo = bisect.bisect_left(artifact_index_times, start)
+    hi = bisect.bisect_left(artifact_index_times, end) if end is not None else len(artifact_index_times)
+    stats = {}
+    for user_id, arti in artifact_index_entries[lo:hi]:
+        max_cv, count_45, count_40 = stats.get(user_id, (0, 0, 0))
+        stats[user_id] = (
+            max(max_cv, arti["cv"]),
+            count_45 + (arti["cv"] >= 45),
+            count_40 + (arti["cv"] >= 40)
+        )
+    return stats
+
+# Parse a /leaderboard window like "7d", "12h" or "2026-01-01..2026-03-31".
+# Returns per-user stats, or None if the window is invalid.
+def get_window_stats(window: str):
+    window = window.strip().lower()
+    if window in LEADERBOARD_WINDOWS:
+        return get_configured_window_stats(window)
+
+    match = re.fullmatch(r"(\d+)([hdw])", window)
+    if match:
+        seconds = int(match.group(1)) * WINDOW_UNITS[match.group(2)]
+        return get_range_stats(now_timestamp() - seconds)
+
+    match = re.fullmatch(r"(\d{4}-\d{2}-\d{2})\.\.(\d{4}-\d{2}-\d{2})", window)
+    if match:
+        try:
+            start = datetime.strptime(match.group(1), "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            end = datetime.strptime(match.group(2), "%Y-%m-%d").replace(tzinfo=timezone.utc) + timedelta(days=1)
+        except (ValueError, OverflowError):
+            return None
+        return get_range_stats(int(start.timestamp()), int(end.timestamp()))
+
+    return None
+
+# Load data, trusting the snapshot's precomputed stats when it is valid. Returns the file used.
+def load_startup_data(use_snapshot=True):
+    global data, artifact_index_times, artifact_index_entries
+    # Loading creates many objects at once; collecting while they are created only slows it down
+    gc.disable()
+    try:
+        snapshot = load_snapshot() if use_snapshot else None
+        if snapshot is not None:
+            data, artifact_index_times, artifact_index_entries = snapshot
+            build_window_aggregates()
+            return SNAPSHOT_FILE
+
+        data = load_data()
+        initialize_leaderboard_stats()
+        if use_snapshot and os.path.exists(DATA_FILE):
+            save_snapshot(data)
+        return DATA_FILE
+    finally:
+        gc.enable()
+
+data = {}  # Filled by load_startup_data() when the bot is run
 
 # Load language mappings
 def load_languages():
@@ -117,6 +474,8 @@ def get_display_name(user_id: str, fallback_user=None):
         return display_name
     if fallback_user:
         return getattr(fallback_user, "display_name", fallback_user.name)
+    if user_data.get("username"):
+        return user_data["username"]
     return "Unknown"
 
 # Count artifacts above a CV threshold
@@ -152,6 +511,60 @@ def get_leaderboard_ranks():
     )
     return {user_id: rank + 1 for rank, (user_id, _) in enumerate(sorted_leaderboard)}
 
+# Low-memory mode member cache: (guild_id, user_id) -> (expires_at, member or None if not in the guild)
+member_cache = OrderedDict()
+
+def cache_member(guild_id: int, user_id: int, member):
+    member_cache[(guild_id, user_id)] = (time.monotonic() + MEMBER_CACHE_TTL, member)
+    member_cache.move_to_end((guild_id, user_id))
+    while len(member_cache) > MEMBER_CACHE_SIZE:
+        member_cache.popitem(last=False)  # Evict least recently used
+
+# Returns (found, member). found is False if the member has to be looked up.
+def get_cached_member(guild_id: int, user_id: int):
+    entry = member_cache.get((guild_id, user_id))
+    if entry is None:
+        return False, None
+    expires_at, member = entry
+    if expires_at < time.monotonic():
+        del member_cache[(guild_id, user_id)]
+        return False, None
+    member_cache.move_to_end((guild_id, user_id))
+    return True, member
+
+# Look up guild members by ID. Members not in the guild map to None.
+async def get_members(guild, user_ids):
+    if not LOW_MEMORY_MODE:
+        return {user_id: guild.get_member(user_id) for user_id in user_ids}
+
+    members = {}
+    missing = []
+    for user_id in user_ids:
+        found, member = get_cached_member(guild.id, user_id)
+        if found:
+            members[user_id] = member
+        else:
+            missing.append(user_id)
+
+    # Query uncached members in batches instead of one request each
+    for start in range(0, len(missing), MEMBER_QUERY_LIMIT):
+        batch = missing[start:start + MEMBER_QUERY_LIMIT]
+        try:
+            queried = await guild.query_members(user_ids=batch, limit=len(batch), cache=False)
+        except (asyncio.TimeoutError, discord.ClientException):
+            continue  # Leave them uncached so the next lookup tries again
+        queried_by_id = {member.id: member for member in queried}
+        for user_id in batch:
+            member = queried_by_id.get(user_id)
+            cache_member(guild.id, user_id, member)
+            members[user_id] = member
+
+    return members
+
+async def get_member(guild, user_id: int):
+    members = await get_members(guild, [user_id])
+    return members.get(user_id)
+
 # Resolve user identifier to user_id
 async def resolve_user(interaction: discord.Interaction, user_identifier: str = None) -> str:
     if not user_identifier:
@@ -165,6 +578,9 @@ async def resolve_user(interaction: discord.Interaction, user_identifier: str =
         if display_name and display_name.lower() == user_identifier_lower:
             return uid
 
+    if LOW_MEMORY_MODE:
+        return await resolve_user_low_memory(interaction.guild, user_identifier_lower)
+
     # 2. Match guild member display name (nickname or username fallback)
     for member in interaction.guild.members:
         if member.display_name.lower() == user_identifier_lower:
@@ -177,6 +593,31 @@ async def resolve_user(interaction: discord.Interaction, user_identifier: str =
 
     return None
 
+# Resolve without the guild member list: saved usernames first, then ask Discord
+async def resolve_user_low_memory(guild, user_identifier_lower: str) -> str:
+    # 2. Match Discord username saved in data
+    for uid, udata in data.items():
+        username = udata.get("username")
+        if username and username.lower() == user_identifier_lower:
+            return uid
+
+    # 3. Search guild members whose username or nickname starts with the identifier
+    try:
+        members = await guild.query_members(query=user_identifier_lower, limit=MEMBER_QUERY_LIMIT, cache=False)
+    except (asyncio.TimeoutError, discord.ClientException):
+        return None
+    for member in members:
+        cache_member(guild.id, member.id, member)
+
+    for member in members:
+        if member.display_name.lower() == user_identifier_lower:
+            return str(member.id)
+    for member in members:
+        if member.name.lower() == user_identifier_lower:
+            return str(member.id)
+
+    return None
+
 # Build rank change message
 def build_rank_message(old_rank, new_rank, is_new_user=False):
     if is_new_user:
@@ -266,6 +707,199 @@ async def fetch_avatar_bytes(url: str) -> BytesIO:
             data = await resp.read()
             return BytesIO(data)
 
+# (max_cv, count_45, count_40) for each user across all time
+def get_all_time_stats():
+    return {
+        user_id: (
+            user_data["max_cv"],
+            count_artifacts(user_data["artifacts"], 45),
+            count_artifacts(user_data["artifacts"], 40)
+        )
+        for user_id, user_data in data.items()
+    }
+
+# Build leaderboard lines and find the #1 player's member object
+async def build_leaderboard_lines(guild, stats=None):
+    stats = stats if stats is not None else get_all_time_stats()
+    sorted_leaderboard = sorted(stats.items(), key=lambda item: item[1], reverse=True)
+
+    lines = [
+        "# |Name         |Max |45+|40+",
+        "--+-------------+----+---+---"
+    ]
+
+    top_user_member = None
+
+    top_entries = sorted_leaderboard[:MAX_LEADERBOARD_PLAYERS]
+    members = await get_members(guild, [int(user_id) for user_id, _ in top_entries])
+
+    for rank, (user_id, (max_cv, count_45, count_40)) in enumerate(top_entries, start=1):
+        member = members.get(int(user_id))
+        # Low-memory mode names other players from saved data instead of fetching each user
+        if not member and (rank == 1 or not LOW_MEMORY_MODE):
+            try:
+                member = await bot.fetch_user(int(user_id))
+            except Exception:
+                member = None
+
+        # Save #1 player's member object
+        if rank == 1 and member:
+            top_user_member = member
+
+        name = get_display_name(user_id, fallback_user=member)
+        if len(name) > MAX_NAME_LENGTH:
+            name = name[:MAX_NAME_LENGTH - 1] + "-"
+
+        lines.append(
+            f"{rank:<2}|{name.ljust(MAX_NAME_LENGTH)}|"
+            f"{max_cv:<4.1f}|"
+            f"{count_45:<3}|"
+            f"{count_40:<3}"
+        )
+
+    return lines, top_user_member
+
+# Build embed with leaderboard text
+def build_leaderboard_embed(lines, live=False, window=None):
+    description_text = f"```\n{chr(10).join(lines)}\n```"
+    embed = Embed(
+        title=f"CRIT Value Leaderboard ({window})" if window else "CRIT Value Leaderboard",
+        description=description_text,
+        color=0x3498db
+    )
+    if live:
+        embed.set_footer(text="Updates automatically")
+    return embed
+
+# Label the #1 player's avatar at the bottom of the embed
+def add_top_avatar(embed: Embed, top_user_member):
+    top_name = get_display_name(top_user_member.id, fallback_user=top_user_member)
+    embed.add_field(name=f"I'm sick of {top_name}.", value="", inline=True)
+    embed.set_image(url="attachment://top_avatar.png")
+
+# Download and resize the #1 player's avatar. Returns None if it can't be fetched.
+async def fetch_top_avatar_bytes(top_user_member):
+    avatar_url = top_user_member.display_avatar.url
+    async with aiohttp.ClientSession() as session:
+        async with session.get(avatar_url) as resp:
+            if resp.status != 200:
+                return None
+            avatar_bytes = await resp.read()
+
+    # Open image and resize with high-quality resampling
+    img = Image.open(BytesIO(avatar_bytes)).convert("RGBA")
+    img = img.resize((AVATAR_DISPLAY_SIZE, AVATAR_DISPLAY_SIZE), resample=Image.LANCZOS)
+
+    output = BytesIO()
+    img.save(output, format="PNG")
+    return output.getvalue()
+
+# Resized avatar ready for Discord upload
+def make_top_avatar_file(avatar_bytes: bytes):
+    return discord.File(BytesIO(avatar_bytes), filename="top_avatar.png")
+
+async def fetch_top_avatar_file(top_user_member):
+    avatar_bytes = await fetch_top_avatar_bytes(top_user_member)
+    return make_top_avatar_file(avatar_bytes) if avatar_bytes else None
+
+# ----------------- Live Leaderboard -----------------
+
+# Live leaderboard helper functions
+def load_live_leaderboards():
+    if os.path.exists(LIVE_LEADERBOARD_FILE):
+        with open(LIVE_LEADERBOARD_FILE, "r") as f:
+            return json.load(f)
+    return {}
+
+def save_live_leaderboards(live_leaderboards):
+    with open(LIVE_LEADERBOARD_FILE, "w") as f:
+        json.dump(live_leaderboards, f, indent=4)
+
+live_leaderboards = load_live_leaderboards()  # channel_id -> message_id
+live_leaderboard_signatures = {}  # channel_id -> last rendered (top section, top avatar)
+live_leaderboard_task = None
+live_leaderboard_last_edit = 0.0
+
+# Identifies the uploaded #1 avatar. It only has to be re-uploaded when this changes.
+def get_avatar_key(top_user_member):
+    if not top_user_member:
+        return None
+    return top_user_member.id, top_user_member.display_avatar.url
+
+# What a live leaderboard currently shows: (embed text, avatar key). Edits are skipped when this is unchanged.
+def get_leaderboard_signature(embed: Embed, top_user_member):
+    top_name = get_display_name(top_user_member.id, fallback_user=top_user_member) if top_user_member else None
+    return (embed.description, top_name), get_avatar_key(top_user_member)
+
+# Call after any change to the leaderboard. Bursts are coalesced into one edit per interval.
+def schedule_live_leaderboard_update():
+    global live_leaderboard_task
+    if not live_leaderboards:
+        return
+    if live_leaderboard_task and not live_leaderboard_task.done():
+        return  # An edit is already pending and will include this change
+    live_leaderboard_task = asyncio.create_task(update_live_leaderboards())
+
+async def update_live_leaderboards():
+    global live_leaderboard_task, live_leaderboard_last_edit
+    delay = live_leaderboard_last_edit + LIVE_LEADERBOARD_EDIT_INTERVAL - time.monotonic()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+    # Changes made while rendering schedule a new edit
+    live_leaderboard_task = None
+    live_leaderboard_last_edit = time.monotonic()
+
+    # Render once per server and download each avatar once, however many channels show it
+    renders = {}  # guild_id -> (lines, top_user_member)
+    avatars = {}  # avatar key -> resized avatar bytes
+
+    config_changed = False
+    for channel_id, message_id in list(live_leaderboards.items()):
+        try:
+            channel = bot.get_channel(int(channel_id)) or await bot.fetch_channel(int(channel_id))
+            if channel.guild.id not in renders:
+                renders[channel.guild.id] = await build_leaderboard_lines(channel.guild)
+            lines, top_user_member = renders[channel.guild.id]
+            await edit_live_leaderboard(channel, channel_id, message_id, lines, top_user_member, avatars)
+        except discord.NotFound:
+            print(f"Live leaderboard in channel {channel_id} no longer exists, removing it.")
+            live_leaderboards.pop(channel_id, None)
+            live_leaderboard_signatures.pop(channel_id, None)
+            config_changed = True
+        except Exception:
+            traceback.print_exc()
+
+    if config_changed:
+        save_live_leaderboards(live_leaderboards)
+
+async def edit_live_leaderboard(channel, channel_id: str, message_id: int, lines, top_user_member, avatars: dict):
+    embed = build_leaderboard_embed(lines, live=True)
+    signature = get_leaderboard_signature(embed, top_user_member)
+    old_signature = live_leaderboard_signatures.get(channel_id)
+    if signature == old_signature:
+        return
+
+    message = channel.get_partial_message(message_id)
+    text, avatar_key = signature
+
+    # Only download and re-upload the avatar when the #1 player or their avatar changed
+    if old_signature and avatar_key and old_signature[1] == avatar_key:
+        add_top_avatar(embed, top_user_member)
+        await message.edit(embed=embed)
+    else:
+        if avatar_key and avatar_key not in avatars:
+            avatars[avatar_key] = await fetch_top_avatar_bytes(top_user_member)
+        avatar_bytes = avatars.get(avatar_key)
+        if avatar_bytes:
+            add_top_avatar(embed, top_user_member)
+            await message.edit(embed=embed, attachments=[make_top_avatar_file(avatar_bytes)])
+        else:
+            signature = text, None  # Try the avatar again on the next edit
+            await message.edit(embed=embed, attachments=[])
+
+    live_leaderboard_signatures[channel_id] = signature
+
 # ----------------- Events -----------------
 
 @bot.event
@@ -318,6 +952,9 @@ async def on_ready():
     except Exception as e:
         print(f"Unexpected error during guild sync: {e}")
 
+    # Bring live leaderboards up to date with changes made while offline
+    schedule_live_leaderboard_update()
+
 # ----------------- Commands -----------------
 
 # /name
@@ -325,9 +962,10 @@ async def on_ready():
 @app_commands.describe(new_name="The name you want to display on the leaderboard")
 async def name(interaction: discord.Interaction, new_name: str):
     user_id = str(interaction.user.id)
-    ensure_user(user_id)
+    ensure_user(user_id, interaction.user)
     data[user_id]["display_name"] = new_name
     save_data(data)
+    schedule_live_leaderboard_update()
     embed = Embed(
         title="Leaderboard Name Updated",
         description=f"Your leaderboard name is now set to **{new_name}**",
@@ -341,7 +979,7 @@ async def name(interaction: discord.Interaction, new_name: str):
 async def submit(interaction: discord.Interaction, crit_rate: float, crit_dmg: float):
     user_id = str(interaction.user.id)
     was_new_user = user_id not in data
-    ensure_user(user_id)
+    ensure_user(user_id, interaction.user)
 
     # Validate stats
     crit_rate, crit_dmg, error = validate_artifact_stats(crit_rate, crit_dmg)
@@ -357,8 +995,9 @@ async def submit(interaction: discord.Interaction, crit_rate: float, crit_dmg: f
     old_rank = get_leaderboard_ranks().get(user_id)
     cv = calculate_cv(crit_rate, crit_dmg)
 
-    artifact = {"crit_rate": crit_rate, "crit_dmg": crit_dmg, "cv": cv}
+    artifact = {"crit_rate": crit_rate, "crit_dmg": crit_dmg, "cv": cv, "submitted_at": now_timestamp()}
     data[user_id]["artifacts"].append(artifact)
+    index_artifact(user_id, artifact)
 
     # Incremental update
     if cv > data[user_id]["max_cv"]:
@@ -369,6 +1008,7 @@ async def submit(interaction: discord.Interaction, crit_rate: float, crit_dmg: f
         data[user_id]["count_40"] += 1
 
     save_data(data)
+    schedule_live_leaderboard_update()
 
     new_rank = get_leaderboard_ranks().get(user_id)
     rank_msg = build_rank_message(old_rank, new_rank, was_new_user)
@@ -407,7 +1047,7 @@ async def list_artifacts(interaction: discord.Interaction, user_identifier: str
         lines.append(f"{idx:<5} | {arti['crit_rate']:<4.1f} | {arti['crit_dmg']:<4.1f} | {arti['cv']:<4.1f}")
 
     artifact_text = "\n".join(lines)
-    target_member = interaction.guild.get_member(int(target_user_id))
+    target_member = await get_member(interaction.guild, int(target_user_id))
     display_name = get_display_name(target_user_id, fallback_user=target_member)
     embed = Embed(
         title=f"Artifacts for {display_name}",
@@ -440,6 +1080,7 @@ async def remove(interaction: discord.Interaction, user_identifier: str, artifac
 
         old_rank = get_leaderboard_ranks().get(target_user_id)
         removed = artifacts.pop(artifact_index - 1)
+        unindex_artifact(target_user_id, removed)
 
         # Update incremental counts
         if removed["cv"] >= 45:
@@ -452,6 +1093,7 @@ async def remove(interaction: discord.Interaction, user_identifier: str, artifac
             user_data["max_cv"] = max((a["cv"] for a in artifacts), default=0)
 
         save_data(data)
+        schedule_live_leaderboard_update()
 
         new_rank = get_leaderboard_ranks().get(target_user_id)
         rank_msg = build_rank_message(old_rank, new_rank)
@@ -466,8 +1108,11 @@ async def remove(interaction: discord.Interaction, user_identifier: str, artifac
     # Remove entire user
     old_rank = get_leaderboard_ranks().get(target_user_id)
     removed_name = get_display_name(target_user_id, fallback_user=interaction.user)
+    for arti in data[target_user_id].get("artifacts", []):
+        unindex_artifact(target_user_id, arti)
     data.pop(target_user_id)
     save_data(data)
+    schedule_live_leaderboard_update()
 
     embed = Embed(title="User Removed", color=0xe74c3c)
     embed.description = f"Removed **{removed_name}** and all their artifacts."
@@ -514,6 +1159,7 @@ async def modify(interaction: discord.Interaction, user_identifier: str, artifac
     artifact["crit_rate"] = crit_rate
     artifact["crit_dmg"] = crit_dmg
     artifact["cv"] = calculate_cv(crit_rate, crit_dmg)
+    reindex_artifact_cv(target_user_id, artifact, old_cv)
 
     # Add new counts
     if artifact["cv"] >= 45:
@@ -528,6 +1174,7 @@ async def modify(interaction: discord.Interaction, user_identifier: str, artifac
         data[target_user_id]["max_cv"] = max((a["cv"] for a in artifacts), default=0)
 
     save_data(data)
+    schedule_live_leaderboard_update()
 
     new_rank = get_leaderboard_ranks().get(target_user_id)
     rank_msg = build_rank_message(old_rank, new_rank)
@@ -551,7 +1198,7 @@ async def modify(interaction: discord.Interaction, user_identifier: str, artifac
 async def handle_scan(interaction: discord.Interaction, image: discord.Attachment):
     user_id = str(interaction.user.id)
     was_new_user = user_id not in data
-    ensure_user(user_id)
+    ensure_user(user_id, interaction.user)
 
     user_lang = data[user_id].get("language", "en")
     ocr_langs_to_use = [user_lang]
@@ -594,8 +1241,9 @@ async def handle_scan(interaction: discord.Interaction, image: discord.Attachmen
 
     # Add artifact
     cv = calculate_cv(crit_rate, crit_dmg)
-    artifact = {"crit_rate": crit_rate, "crit_dmg": crit_dmg, "cv": cv}
+    artifact = {"crit_rate": crit_rate, "crit_dmg": crit_dmg, "cv": cv, "submitted_at": now_timestamp()}
     data[user_id]["artifacts"].append(artifact)
+    index_artifact(user_id, artifact)
 
     # Incremental update
     if cv > data[user_id]["max_cv"]:
@@ -606,6 +1254,7 @@ async def handle_scan(interaction: discord.Interaction, image: discord.Attachmen
         data[user_id]["count_40"] += 1
 
     save_data(data)
+    schedule_live_leaderboard_update()
 
     # Get new rank after adding artifact
     new_rank = get_leaderboard_ranks().get(user_id)
@@ -649,7 +1298,7 @@ language_codes = ", ".join(languages.keys()) # Build dynamic description for the
 @app_commands.describe(language=f"Available options: {language_codes}")
 async def language(interaction: discord.Interaction, language: str):
     user_id = str(interaction.user.id)
-    ensure_user(user_id)
+    ensure_user(user_id, interaction.user)
     
     language = language.lower()
     if language not in languages:
@@ -673,94 +1322,99 @@ async def language(interaction: discord.Interaction, language: str):
 
 # /leaderboard
 @bot.tree.command(name="leaderboard", description="Display the CRIT Value leaderboard publicly")
-async def leaderboard(interaction: discord.Interaction):
-    if not data:
+@app_commands.describe(window="Optional: time window such as 24h, 7d, 30d or 2026-01-01..2026-03-31")
+async def leaderboard(interaction: discord.Interaction, window: str = None):
+    stats = None
+    if window:
+        stats = get_window_stats(window)
+        if stats is None:
+            embed = Embed(
+                title="Invalid Window",
+                description=(
+                    f"Use {', '.join(LEADERBOARD_WINDOWS)}, a number of hours/days/weeks (e.g. 12h, 3d, 2w) "
+                    "or a date range (e.g. 2026-01-01..2026-03-31)."
+                ),
+                color=0xe74c3c
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+    if not data or stats == {}:
         embed = Embed(
             title="Leaderboard Empty",
-            description="No artifacts have been submitted yet.",
+            description="No artifacts have been submitted in this window." if window else "No artifacts have been submitted yet.",
             color=0xe74c3c
         )
         await interaction.response.send_message(embed=embed)
         return
 
-    sorted_leaderboard = sorted(
-        data.items(),
-        key=lambda item: (
-            item[1]["max_cv"],
-            count_artifacts(item[1]["artifacts"], 45),
-            count_artifacts(item[1]["artifacts"], 40)
-        ),
-        reverse=True
-    )
+    lines, top_user_member = await build_leaderboard_lines(interaction.guild, stats)
+    embed = build_leaderboard_embed(lines, window=window.strip().lower() if window else None)
 
-    lines = [
-        "# |Name         |Max |45+|40+",
-        "--+-------------+----+---+---"
-    ]
+    # If top player exists, attach their avatar at the bottom with a label
+    if top_user_member:
+        file = await fetch_top_avatar_file(top_user_member)
+        if file:
+            add_top_avatar(embed, top_user_member)
+            await interaction.response.send_message(embed=embed, file=file)
+            return
 
-    top_user_member = None
+    # Fallback: send embed without image
+    await interaction.response.send_message(embed=embed)
 
-    for rank, (user_id, user_data) in enumerate(
-        sorted_leaderboard[:MAX_LEADERBOARD_PLAYERS], start=1
-    ):
-        member = interaction.guild.get_member(int(user_id))
-        if not member:
-            try:
-                member = await bot.fetch_user(int(user_id))
-            except Exception:
-                member = None
+# /liveleaderboard
+@bot.tree.command(name="liveleaderboard", description="Post a pinned leaderboard in this channel that updates automatically")
+@app_commands.default_permissions(manage_messages=True)
+async def live_leaderboard(interaction: discord.Interaction):
+    lines, top_user_member = await build_leaderboard_lines(interaction.guild)
+    channel_id = str(interaction.channel_id)
 
-        # Save #1 player's member object
-        if rank == 1 and member:
-            top_user_member = member
+    # Refresh this channel's existing live leaderboard instead of posting another one
+    if channel_id in live_leaderboards:
+        live_leaderboard_signatures.pop(channel_id, None)
+        try:
+            await edit_live_leaderboard(
+                interaction.channel, channel_id, live_leaderboards[channel_id], lines, top_user_member, {}
+            )
+        except discord.NotFound:
+            live_leaderboards.pop(channel_id)  # It was deleted, so post a new one below
+        else:
+            embed = Embed(
+                title="Live Leaderboard Refreshed",
+                description="This channel already has a live leaderboard. It has been updated.",
+                color=0x1abc9c
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
 
-        name = get_display_name(user_id, fallback_user=member)
-        if len(name) > MAX_NAME_LENGTH:
-            name = name[:MAX_NAME_LENGTH - 1] + "-"
+    embed = build_leaderboard_embed(lines, live=True)
+    file = await fetch_top_avatar_file(top_user_member) if top_user_member else None
+    if file:
+        add_top_avatar(embed, top_user_member)
+        await interaction.response.send_message(embed=embed, file=file)
+    else:
+        await interaction.response.send_message(embed=embed)
 
-        lines.append(
-            f"{rank:<2}|{name.ljust(MAX_NAME_LENGTH)}|"
-            f"{user_data['max_cv']:<4.1f}|"
-            f"{count_artifacts(user_data['artifacts'], 45):<3}|"
-            f"{count_artifacts(user_data['artifacts'], 40):<3}"
-        )
+    message = await interaction.original_response()
+    try:
+        await message.pin()
+    except discord.HTTPException as e:
+        print(f"Could not pin live leaderboard in channel {interaction.channel_id}: {e}")
 
-    # Build embed with leaderboard text
-    description_text = f"```\n{chr(10).join(lines)}\n```"
-    embed = Embed(
-        title="CRIT Value Leaderboard",
-        description=description_text,
-        color=0x3498db
-    )
+    live_leaderboards[channel_id] = message.id
+    signature = get_leaderboard_signature(embed, top_user_member)
+    live_leaderboard_signatures[channel_id] = signature if file else (signature[0], None)
+    save_live_leaderboards(live_leaderboards)
 
-    # If top player exists, attach their avatar at the bottom with a label
-    if top_user_member:
-        avatar_url = top_user_member.display_avatar.url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(avatar_url) as resp:
-                if resp.status == 200:
-                    avatar_bytes = await resp.read()
-
-                    # Open image and resize with high-quality resampling
-                    img = Image.open(BytesIO(avatar_bytes)).convert("RGBA")
-                    img = img.resize((AVATAR_DISPLAY_SIZE, AVATAR_DISPLAY_SIZE), resample=Image.LANCZOS)
-
-                    # Save to BytesIO for Discord upload
-                    output = BytesIO()
-                    img.save(output, format="PNG")
-                    output.seek(0)
-
-                    # Prepare file and embed
-                    file = discord.File(output, filename="top_avatar.png")
-                    top_name = get_display_name(top_user_member.id, fallback_user=top_user_member)
-                    embed.add_field(name=f"I'm sick of {top_name}.", value="", inline=True)
-                    embed.set_image(url="attachment://top_avatar.png")
-
-                    await interaction.response.send_message(embed=embed, file=file)
-                    return
+# Run bot
+if __name__ == "__main__":
+    startup_timer = time.perf_counter()
+    startup_source = load_startup_data()
+    gc.freeze()  # Loaded data lives for the whole run, so keep it out of future collections
+    print(f"Loaded {len(data)} user(s) from {startup_source} in {(time.perf_counter() - startup_timer) * 1000:.1f} ms")
 
-    # Fallback: send embed without image
-    await interaction.response.send_message(embed=embed)
+    # Load token
+    with open("token", "r") as f:
+        TOKEN = f.read().strip()
 
-# Run bot
-bot.run(TOKEN)
+    bot.run(TOKEN)
@@ -0,0 +1,377 @@
+"""
+Load-test harness for the leaderboard bot.
+
+Runs the command coroutines from bot.py against stand-in Discord objects and a
+local aiohttp server that mimics the EasyOCR API, so production-like load can be
+reproduced without touching Discord or api.easyocr.org.
+
+Example:
+    python load_test.py --users 50 --requests 20 --ocr-latency 0.3 --ocr-error-rate 0.05
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import socket
+import tempfile
+import time
+from io import BytesIO
+
+from PIL import Image
+from aiohttp import web
+
+import bot
+
+# Constants
+DEFAULT_MIX = "submit=3,scan=3,leaderboard=2,window=1,list=2,modify=1,remove=1"
+LAG_SAMPLE_INTERVAL = 0.01  # Seconds between event-loop lag samples
+SEED_HISTORY = 60 * 24 * 60 * 60  # Pre-loaded artifacts are spread over this many seconds
+
+# ----------------- Fake Discord Objects -----------------
+
+class FakeAsset:
+    def __init__(self, url: str):
+        self.url = url
+
+class FakeMember:
+    def __init__(self, user_id: int, name: str, avatar_url: str, nick: str = None):
+        self.id = user_id
+        self.name = name
+        self.display_name = nick or name
+        self.display_avatar = FakeAsset(avatar_url)
+
+class FakeGuild:
+    def __init__(self, members, cached=True, query_latency=0.0):
+        self.id = 1
+        self.all_members = list(members)  # Every member, even those discord.py hasn't cached
+        self._all_members = {member.id: member for member in members}
+        # Without the member cache, discord.py knows no members until they are queried
+        self.members = list(members) if cached else []
+        self._members_by_id = self._all_members if cached else {}
+        self.query_latency = query_latency
+
+    def get_member(self, user_id: int):
+        return self._members_by_id.get(user_id)
+
+    async def query_members(self, query=None, *, limit=5, user_ids=None, cache=True):
+        await asyncio.sleep(self.query_latency)
+        if user_ids is not None:
+            found = [self._all_members[user_id] for user_id in user_ids if user_id in self._all_members]
+        else:
+            found = [
+                member for member in self._all_members.values()
+                if member.name.lower().startswith(query.lower()) or member.display_name.lower().startswith(query.lower())
+            ]
+        return found[:limit]
+
+class FakeAttachment:
+    def __init__(self, filename: str, payload: bytes):
+        self.filename = filename
+        self._payload = payload
+
+    async def read(self):
+        return self._payload
+
+class FakeResponse:
+    def __init__(self):
+        self.messages = []
+
+    def is_done(self):
+        return bool(self.messages)
+
+    async def send_message(self, content=None, **kwargs):
+        self.messages.append((content, kwargs))
+
+class FakeInteraction:
+    def __init__(self, user: FakeMember, guild: FakeGuild):
+        self.user = user
+        self.guild = guild
+        self.response = FakeResponse()
+        self.edits = []
+
+    async def edit_original_response(self, **kwargs):
+        self.edits.append(kwargs)
+
+# ----------------- Local EasyOCR Stand-in -----------------
+
+# Build a small PNG once so every scan and avatar request reuses it
+def make_png(size: int, color) -> bytes:
+    output = BytesIO()
+    Image.new("RGB", (size, size), color).save(output, format="PNG")
+    return output.getvalue()
+
+# Pick valid CRIT Rate / CRIT DMG values
+def random_crit_stats(rng: random.Random):
+    crit_rate = round(rng.uniform(0, bot.MAX_CV / 2 - 1), 1)
+    crit_dmg = round(rng.uniform(0, bot.MAX_CV - crit_rate * 2), 1)
+    return crit_rate, crit_dmg
+
+def make_ocr_app(latency: float, jitter: float, error_rate: float, rng: random.Random, avatar_png: bytes):
+    async def ocr(request: web.Request):
+        await request.post()  # Consume the multipart upload like the real API
+        await asyncio.sleep(max(0.0, rng.gauss(latency, jitter)))
+        if rng.random() < error_rate:
+            return web.Response(status=500, text="Simulated OCR failure")
+
+        crit_rate, crit_dmg = random_crit_stats(rng)
+        lines = ["Gladiator's Finale", "ATK +311", f"CRIT Rate+{crit_rate}%", f"CRIT DMG+{crit_dmg}%"]
+        words = [
+            {"text": line, "confidence": 0.99, "bbox": [[0, i * 20], [200, i * 20], [200, i * 20 + 18], [0, i * 20 + 18]]}
+            for i, line in enumerate(lines)
+        ]
+        return web.json_response({"words": words})
+
+    async def avatar(request: web.Request):
+        return web.Response(body=avatar_png, content_type="image/png")
+
+    app = web.Application()
+    app.router.add_post("/ocr", ocr)
+    app.router.add_get("/avatar.png", avatar)
+    return app
+
+async def start_server(app: web.Application):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.SockSite(runner, sock).start()
+    return runner, f"http://127.0.0.1:{port}"
+
+# ----------------- Virtual Users -----------------
+
+# Parse "submit=3,scan=1" into command weights
+def parse_mix(mix: str):
+    weights = {}
+    for part in mix.split(","):
+        command, _, weight = part.partition("=")
+        weights[command.strip()] = float(weight or 1)
+    unknown = set(weights) - set(COMMANDS)
+    if unknown:
+        raise SystemExit(f"Unknown command(s) in --mix: {', '.join(sorted(unknown))}")
+    return weights
+
+async def run_submit(rng, member, guild, scan_png):
+    crit_rate, crit_dmg = random_crit_stats(rng)
+    await bot.submit.callback(FakeInteraction(member, guild), crit_rate, crit_dmg)
+
+async def run_scan(rng, member, guild, scan_png):
+    await bot.handle_scan(FakeInteraction(member, guild), FakeAttachment("artifact.png", scan_png))
+
+async def run_leaderboard(rng, member, guild, scan_png):
+    await bot.leaderboard.callback(FakeInteraction(member, guild))
+
+async def run_window_leaderboard(rng, member, guild, scan_png):
+    await bot.leaderboard.callback(FakeInteraction(member, guild), rng.choice(list(bot.LEADERBOARD_WINDOWS)))
+
+# Name other players would type to find this member. Players without a leaderboard
+# name are looked up by username or nickname, which exercises the guild member lookups.
+def lookup_name(member):
+    return bot.data.get(str(member.id), {}).get("display_name") or member.display_name
+
+async def run_list(rng, member, guild, scan_png):
+    target = rng.choice(guild.all_members)
+    await bot.list_artifacts.callback(FakeInteraction(member, guild), lookup_name(target))
+
+async def run_modify(rng, member, guild, scan_png):
+    artifacts = bot.data.get(str(member.id), {}).get("artifacts", [])
+    crit_rate, crit_dmg = random_crit_stats(rng)
+    index = rng.randint(1, len(artifacts)) if artifacts else 1
+    await bot.modify.callback(FakeInteraction(member, guild), lookup_name(member), index, crit_rate, crit_dmg)
+
+async def run_remove(rng, member, guild, scan_png):
+    artifacts = bot.data.get(str(member.id), {}).get("artifacts", [])
+    index = rng.randint(1, len(artifacts)) if artifacts else 1
+    await bot.remove.callback(FakeInteraction(member, guild), lookup_name(member), index)
+
+COMMANDS = {
+    "submit": run_submit,
+    "scan": run_scan,
+    "leaderboard": run_leaderboard,
+    "window": run_window_leaderboard,
+    "list": run_list,
+    "modify": run_modify,
+    "remove": run_remove,
+}
+
+async def virtual_user(member, guild, rng, weights, requests, think_time, scan_png, latencies, failures):
+    commands = list(weights)
+    command_weights = [weights[c] for c in commands]
+    for _ in range(requests):
+        command = rng.choices(commands, weights=command_weights)[0]
+        start = time.perf_counter()
+        try:
+            await COMMANDS[command](rng, member, guild, scan_png)
+        except Exception as e:
+            failures.setdefault(command, []).append(repr(e))
+        else:
+            latencies.setdefault(command, []).append(time.perf_counter() - start)
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, think_time))
+
+# Sample how late the event loop wakes up while the load runs
+async def monitor_loop_lag(samples, stop: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(LAG_SAMPLE_INTERVAL)
+        samples.append(max(0.0, loop.time() - start - LAG_SAMPLE_INTERVAL))
+
+# ----------------- Reporting -----------------
+
+# Nearest-rank percentile of an already sorted list
+def percentile(sorted_values, pct: float):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def print_report(latencies, failures, lag_samples, elapsed: float):
+    print(f"{'Command':<12}|{'Count':>7}|{'Fail':>5}|{'p50 ms':>9}|{'p95 ms':>9}|{'p99 ms':>9}|{'Max ms':>9}")
+    print("-" * 12 + "+" + "-" * 7 + "+" + "-" * 5 + ("+" + "-" * 9) * 4)
+    total = 0
+    for command in COMMANDS:
+        values = sorted(latencies.get(command, []))
+        failed = len(failures.get(command, []))
+        if not values and not failed:
+            continue
+        total += len(values)
+        print(
+            f"{command:<12}|{len(values):>7}|{failed:>5}|"
+            f"{percentile(values, 50) * 1000:>9.1f}|"
+            f"{percentile(values, 95) * 1000:>9.1f}|"
+            f"{percentile(values, 99) * 1000:>9.1f}|"
+            f"{(values[-1] if values else 0) * 1000:>9.1f}"
+        )
+
+    lag = sorted(lag_samples)
+    print()
+    print(f"Elapsed: {elapsed:.2f}s  Throughput: {total / elapsed if elapsed else 0:.1f} commands/s")
+    print(
+        f"Event-loop lag: p50 {percentile(lag, 50) * 1000:.1f} ms, "
+        f"p99 {percentile(lag, 99) * 1000:.1f} ms, "
+        f"max {(lag[-1] if lag else 0) * 1000:.1f} ms"
+    )
+
+    for command, errors in failures.items():
+        print(f"{command} failure example: {errors[0]}")
+
+# ----------------- Main -----------------
+
+# Virtual users cycle through the ways a player can be found:
+# leaderboard name, saved Discord username, or server nickname
+def make_members(count: int, avatar_url: str):
+    return [
+        FakeMember(10_000 + i, f"vu{i}", avatar_url, nick=f"nick{i}" if i % 3 == 2 else None)
+        for i in range(count)
+    ]
+
+# Replace bot data with virtual users that each have some artifacts
+def seed_users(members, rng: random.Random, artifacts_per_user: int):
+    bot.data.clear()
+    for i, member in enumerate(members):
+        user_id = str(member.id)
+        bot.ensure_user(user_id, member)
+        if i % 3 == 0:
+            bot.data[user_id]["display_name"] = member.name
+        for _ in range(artifacts_per_user):
+            crit_rate, crit_dmg = random_crit_stats(rng)
+            bot.data[user_id]["artifacts"].append({
+                "crit_rate": crit_rate,
+                "crit_dmg": crit_dmg,
+                "cv": bot.calculate_cv(crit_rate, crit_dmg),
+                "submitted_at": bot.now_timestamp() - rng.randint(0, SEED_HISTORY)
+            })
+    bot.initialize_leaderboard_stats()
+
+# Compare startup from data.json (full recompute) against the binary snapshot
+def measure_cold_start(args, repeats: int = 5):
+    rng = random.Random(args.seed)
+    members = make_members(args.users, "")
+    seed_users(members, rng, args.seed_artifacts)
+    bot.save_data(bot.data)
+    expected = bot.get_all_time_stats()
+
+    artifact_count = args.users * args.seed_artifacts
+    print(f"Cold start with {args.users} users and {artifact_count} artifacts (best of {repeats}):")
+    for label, path, use_snapshot in (
+        ("data.json", bot.DATA_FILE, False),
+        ("snapshot", bot.SNAPSHOT_FILE, True),
+    ):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            source = bot.load_startup_data(use_snapshot)
+            timings.append(time.perf_counter() - start)
+        if source != path:
+            raise SystemExit(f"Expected startup from {path} but loaded {source}")
+        if bot.get_all_time_stats() != expected:
+            raise SystemExit(f"{label} startup produced different leaderboard stats")
+        size_kb = os.path.getsize(path) / 1024
+        print(f"  {label:<10} {min(timings) * 1000:>9.1f} ms  {size_kb:>10.1f} KiB")
+
+async def main(args):
+    rng = random.Random(args.seed)
+    weights = parse_mix(args.mix)
+    avatar_png = make_png(bot.AVATAR_DISPLAY_SIZE * 2, (52, 152, 219))
+    scan_png = make_png(256, (40, 40, 40))
+
+    runner, base_url = await start_server(
+        make_ocr_app(args.ocr_latency, args.ocr_jitter, args.ocr_error_rate, rng, avatar_png)
+    )
+    bot.EASYOCR_API_URL = f"{base_url}/ocr"
+
+    # Seed virtual users in an isolated data store
+    members = make_members(args.users, f"{base_url}/avatar.png")
+    bot.LOW_MEMORY_MODE = args.low_memory
+    guild = FakeGuild(members, cached=not args.low_memory, query_latency=args.member_query_latency)
+    seed_users(members, rng, args.seed_artifacts)
+
+    latencies, failures, lag_samples = {}, {}, []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_loop_lag(lag_samples, stop))
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            virtual_user(member, guild, random.Random(rng.random()), weights, args.requests,
+                         args.think_time, scan_png, latencies, failures)
+            for member in members
+        ))
+    finally:
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await monitor
+        await runner.cleanup()
+
+    print_report(latencies, failures, lag_samples, elapsed)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the leaderboard bot commands")
+    parser.add_argument("--users", type=int, default=20, help="Number of concurrent virtual users")
+    parser.add_argument("--requests", type=int, default=20, help="Commands issued by each virtual user")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Command weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Max random pause between commands (seconds)")
+    parser.add_argument("--seed-artifacts", type=int, default=5, help="Artifacts pre-loaded for each user")
+    parser.add_argument("--ocr-latency", type=float, default=0.2, help="Mean OCR response latency (seconds)")
+    parser.add_argument("--ocr-jitter", type=float, default=0.05, help="OCR latency standard deviation (seconds)")
+    parser.add_argument("--ocr-error-rate", type=float, default=0.0, help="Fraction of OCR requests that fail")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs")
+    parser.add_argument("--low-memory", action="store_true", help="Run commands with the bot's low-memory member lookups")
+    parser.add_argument("--member-query-latency", type=float, default=0.05, help="Latency of member queries in --low-memory mode (seconds)")
+    parser.add_argument("--cold-start", action="store_true", help="Only time startup from data.json vs the snapshot")
+    args = parser.parse_args()
+
+    # Never write load-test results into the real data files
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bot.DATA_FILE = os.path.join(tmp_dir, "data.json")
+        bot.SNAPSHOT_FILE = os.path.join(tmp_dir, "data.snapshot")
+        # Live leaderboards were loaded at import; never edit real Discord messages
+        bot.LIVE_LEADERBOARD_FILE = os.path.join(tmp_dir, "live_leaderboards.json")
+        bot.live_leaderboards.clear()
+        if args.cold_start:
+            measure_cold_start(args)
+        else:
+            asyncio.run(main(args))